@@ -2,6 +2,8 @@ import os
 import json
 import re
 import sys
+import pickle
+from array import array
 
 # 設定
 SONGS_DIR = "assets/songs"
@@ -34,6 +36,10 @@ BMS_LANE_MAP = {
     # 16 (スクラッチ) は無視
 }
 
+# 譜面ファイルはあるが変換できなかった (理由はメッセージに入れる)
+class ConversionError(Exception):
+    pass
+
 # --- 共通ヘルパー: 難易度名の推定 ---
 def guess_bms_difficulty(filename, title):
     filename = filename.upper()
@@ -62,8 +68,7 @@ def convert_sm_to_json(sm_path):
         with open(sm_path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
     except Exception as e:
-        print(f"  [Error] Read failed: {e}")
-        return None, None
+        raise ConversionError(f"Read failed: {os.path.basename(sm_path)}: {e}")
 
     title_match = re.search(r"#TITLE:(.*?);", content)
     title = title_match.group(1).strip() if title_match else "Unknown Title"
@@ -208,8 +213,7 @@ def parse_single_bms(bms_path):
         with open(bms_path, 'r', encoding='shift_jis', errors='ignore') as f:
             lines = f.readlines()
     except Exception as e:
-        print(f"  [Error] Read failed: {e}")
-        return None, None
+        raise ConversionError(f"Read failed: {os.path.basename(bms_path)}: {e}")
 
     header = { "title": "Unknown", "artist": "Unknown", "bpm": 130 }
     main_data = {}
@@ -232,7 +236,7 @@ def parse_single_bms(bms_path):
                 main_data[measure].append({ 'channel': cmd[4:6], 'data': val.strip() })
 
     sorted_measures = sorted(main_data.keys())
-    if not sorted_measures: return None, None
+    if not sorted_measures: raise ConversionError(f"No note data: {os.path.basename(bms_path)}")
     max_measure = sorted_measures[-1]
     
     notes = []
@@ -280,10 +284,281 @@ def parse_single_bms(bms_path):
     return header, { "notes": notes, "bpmEvents": bpm_events }
 
 
+# --- 変換結果のレコード ---
+CHART_HEADER_KEYS = ("bpm", "offset", "bpmEvents", "keyCount")
+
+# ノーツは dict のリストではなく列ごとの array で持つ
+class ChartRecord:
+    __slots__ = ("difficulty", "times", "lanes", "durations")
+
+    def __init__(self, difficulty, times, lanes, durations):
+        self.difficulty = difficulty
+        self.times = times
+        self.lanes = lanes
+        self.durations = durations
+
+    @classmethod
+    def from_notes(cls, difficulty, notes):
+        return cls(difficulty,
+                   array('d', (n["time"] for n in notes)),
+                   array('b', (n["lane"] for n in notes)),
+                   array('d', (n["duration"] for n in notes)))
+
+    def __len__(self):
+        return len(self.times)
+
+    # 譜面JSON形式 (タップの duration は従来どおり整数の 0)
+    @property
+    def notes(self):
+        return [{"time": t, "lane": l, "duration": d if d else 0}
+                for t, l, d in zip(self.times, self.lanes, self.durations)]
+
+
+class SongRecord:
+    __slots__ = ("id", "folder", "source", "title", "artist", "bpm", "offset",
+                 "difficulties", "audio_file", "format", "key_count",
+                 "chart_header", "charts", "path")
+
+    # folder_path: 変換元の曲フォルダ (譜面JSONの書き出し先)
+    def __init__(self, folder_path, source, title, artist, bpm, offset, difficulties,
+                 audio_file, fmt, key_count, chart_header, charts):
+        folder = os.path.basename(folder_path)
+        self.id = folder
+        self.folder = folder
+        self.path = folder_path
+        self.source = source
+        self.title = title
+        self.artist = artist
+        self.bpm = bpm
+        self.offset = offset
+        self.difficulties = difficulties
+        self.audio_file = audio_file
+        self.format = fmt
+        self.key_count = key_count
+        self.chart_header = chart_header
+        self.charts = charts
+
+    # song_list.json の1エントリ
+    def to_index_entry(self):
+        return {
+            "id": self.id,
+            "folder": self.folder,
+            "title": self.title,
+            "artist": self.artist,
+            "bpm": self.bpm,
+            "offset": self.offset,
+            "difficulties": self.difficulties,
+            "audioFile": self.audio_file,
+            "format": self.format,
+            "keyCount": self.key_count
+        }
+
+    # <folder>.json の中身
+    def to_chart_data(self):
+        chart_data = dict(self.chart_header)
+        for chart in self.charts:
+            chart_data[chart.difficulty] = chart.notes
+        return chart_data
+
+
+def _split_charts(chart_data):
+    header = {k: chart_data[k] for k in CHART_HEADER_KEYS if k in chart_data}
+    charts = [ChartRecord.from_notes(k, v) for k, v in chart_data.items() if k not in CHART_HEADER_KEYS]
+    return header, charts
+
+
+# --- 曲フォルダ1つ分の変換 (ディスクには書き込まない) ---
+# 譜面ファイルが無いフォルダは None、変換に失敗したフォルダは ConversionError
+def convert_song_folder(folder_path):
+    folder = os.path.basename(folder_path)
+    try:
+        all_files = os.listdir(folder_path)
+    except OSError:
+        return None
+
+    sm_files = [os.path.join(folder_path, f) for f in all_files if f.lower().endswith('.sm')]
+    bms_files = [os.path.join(folder_path, f) for f in all_files if f.lower().endswith(('.bms', '.bme', '.bml'))]
+
+    # 1. SMファイル
+    if sm_files:
+        meta, charts = convert_sm_to_json(sm_files[0])
+
+        found_audio = meta["music_file"]
+        if not found_audio:
+             audio_candidates = [f for f in all_files if f.lower().endswith(('.ogg', '.mp3', '.wav'))]
+             if audio_candidates: found_audio = audio_candidates[0]
+
+        fmt = "mp3"
+        if found_audio:
+            fmt = os.path.splitext(found_audio)[1][1:].lower()
+
+        # ★クリーニング (SMはあまりAnotherがつかないが念のため)
+        clean_title = meta["title"]
+        clean_title = re.sub(r'\s*[\[\(-]?\s*another\s*[\]\)-]?\s*$', '', clean_title, flags=re.IGNORECASE).strip()
+
+        header, chart_records = _split_charts(charts)
+        return SongRecord(folder_path, "SM", clean_title, meta["artist"], meta["bpm"], meta["offset"],
+                          meta["difficulties"], found_audio, fmt, 4, header, chart_records)
+
+    # 2. BMSファイル群
+    if bms_files:
+        merged_charts = { "bpm": 130, "offset": 0, "bpmEvents": [], "keyCount": 7 }
+        difficulties = []
+        base_header = None
+        errors = []
+
+        for bms_file in bms_files:
+            try:
+                header, data = parse_single_bms(bms_file)
+            except ConversionError as e:
+                errors.append(str(e))  # 他の難易度が読めればその曲は使う
+                continue
+
+            if not base_header:
+                base_header = header
+                merged_charts["bpm"] = header["bpm"]
+                merged_charts["bpmEvents"] = data["bpmEvents"]
+
+            fname = os.path.basename(bms_file)
+            diff_name = guess_bms_difficulty(fname, header["title"])
+            if diff_name in merged_charts: diff_name += "_2"
+
+            merged_charts[diff_name] = data["notes"]
+            difficulties.append(diff_name)
+
+        difficulties.sort(key=lambda d: DIFFICULTY_ORDER.get(d, 99))
+
+        if not base_header: raise ConversionError("No parseable BMS file: " + "; ".join(errors))
+
+        found_audio = None
+        audio_candidates = [f for f in all_files if f.lower().endswith(('.ogg', '.mp3', '.wav'))]
+        if audio_candidates:
+            found_audio = audio_candidates[0]
+            for aud in audio_candidates:
+                if "preview" not in aud.lower():
+                    found_audio = aud
+                    break
+        fmt = "mp3"
+        if found_audio:
+            fmt = os.path.splitext(found_audio)[1][1:].lower()
+        else:
+            found_audio = ""
+
+        # ★ここでタイトルから "Another" などを削除！
+        clean_title = base_header["title"]
+        # (Another) [ANOTHER] -Another- Another などを末尾から削除
+        clean_title = re.sub(r'\s*[\[\(-]?\s*another\s*[\]\)-]?\s*$', '', clean_title, flags=re.IGNORECASE).strip()
+        # 必要なら他の難易度も消す (例: Hyper, Normal)
+        clean_title = re.sub(r'\s*[\[\(-]?\s*(hyper|normal|beginner|leggendaria)\s*[\]\)-]?\s*$', '', clean_title, flags=re.IGNORECASE).strip()
+
+        header, chart_records = _split_charts(merged_charts)
+        return SongRecord(folder_path, "BMS", clean_title, base_header["artist"], base_header["bpm"], 0,
+                          difficulties, found_audio, fmt, 7, header, chart_records)
+
+    return None
+
+
+# --- インポート用API: 曲を1つずつ遅延生成 ---
+# on_skip(folder, reason): 変換に失敗して飛ばしたフォルダの通知
+def iter_library(root=SONGS_DIR, on_skip=None):
+    # 空のライブラリとして扱うと JsonSink が song_list.json を [] で上書きしてしまう
+    if not os.path.isdir(root): raise FileNotFoundError(f"Folder not found: {root}")
+
+    for folder in os.listdir(root):
+        folder_path = os.path.join(root, folder)
+        if not os.path.isdir(folder_path): continue
+        try:
+            song = convert_song_folder(folder_path)
+        except ConversionError as e:
+            if on_skip: on_skip(folder, str(e))
+            continue
+        if song: yield song
+
+
+# --- 出力先 (Sink) ---
+# Sink の共通インターフェース:
+#   write(song)  曲を1つ受け取る
+#   close()      全曲の変換が成功した時だけ呼ぶ (出力を確定する)
+#   abort()      途中で失敗した時に呼ぶ (確定済みの出力には触らない)
+
+# 譜面JSONを曲フォルダに書き出し、最後に song_list.json を保存する (従来の出力)
+class JsonSink:
+    def __init__(self, output_list=OUTPUT_LIST):
+        self.output_list = output_list
+        self.song_list = []
+
+    def write(self, song):
+        json_file = os.path.join(song.path, f"{song.folder}.json")
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(song.to_chart_data(), f, indent=2)
+        self.song_list.append(song.to_index_entry())
+
+    def close(self):
+        with open(self.output_list, 'w', encoding='utf-8') as f:
+            json.dump(self.song_list, f, indent=2)
+
+    def abort(self):
+        self.song_list = []  # 途中までの曲リストで song_list.json を上書きしない
+
+
+# SongRecord を pickle で1ファイルに連続して書き出す (read_binary で読み戻せる)
+class BinarySink:
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.file = open(self.tmp_path, 'wb')
+
+    def write(self, song):
+        pickle.dump(song, self.file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def close(self):
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.tmp_path)
+
+
+# 何も書き出さない (変換結果の検証だけしたい場合など)
+class NullSink:
+    def write(self, song):
+        pass
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+def read_binary(path):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+# on_song(song): 1曲を sink に渡すごとの通知
+def convert_library(root=SONGS_DIR, sink=None, on_skip=None, on_song=None):
+    sink = sink if sink is not None else NullSink()
+    count = 0
+    try:
+        for song in iter_library(root, on_skip):
+            sink.write(song)
+            count += 1
+            if on_song: on_song(song)
+    except BaseException:
+        sink.abort()
+        raise
+    sink.close()
+    return count
+
+
 # --- メイン処理 ---
 def scan_all_songs():
-    song_list = []
-    
     if not os.path.exists(SONGS_DIR):
         print(f"Folder not found: {SONGS_DIR}")
         return
@@ -291,124 +566,12 @@ def scan_all_songs():
     folders = [f for f in os.listdir(SONGS_DIR) if os.path.isdir(os.path.join(SONGS_DIR, f))]
     print(f"Found {len(folders)} folders in {SONGS_DIR}...")
 
-    for folder in folders:
-        folder_path = os.path.join(SONGS_DIR, folder)
-        json_file = os.path.join(folder_path, f"{folder}.json")
-        
-        all_files = []
-        try:
-            all_files = os.listdir(folder_path)
-        except OSError:
-            continue
-
-        sm_files = [os.path.join(folder_path, f) for f in all_files if f.lower().endswith('.sm')]
-        bms_files = [os.path.join(folder_path, f) for f in all_files if f.lower().endswith(('.bms', '.bme', '.bml'))]
-        
-        # 1. SMファイル
-        if sm_files:
-            print(f"Processing SM: {folder} ...", end="")
-            meta, charts = convert_sm_to_json(sm_files[0])
-            if meta:
-                with open(json_file, 'w', encoding='utf-8') as f:
-                    json.dump(charts, f, indent=2)
-                
-                found_audio = meta["music_file"]
-                if not found_audio:
-                     audio_candidates = [f for f in all_files if f.lower().endswith(('.ogg', '.mp3', '.wav'))]
-                     if audio_candidates: found_audio = audio_candidates[0]
-
-                fmt = "mp3"
-                if found_audio:
-                    fmt = os.path.splitext(found_audio)[1][1:].lower()
-
-                # ★クリーニング (SMはあまりAnotherがつかないが念のため)
-                clean_title = meta["title"]
-                clean_title = re.sub(r'\s*[\[\(-]?\s*another\s*[\]\)-]?\s*$', '', clean_title, flags=re.IGNORECASE).strip()
-
-                song_list.append({
-                    "id": folder,
-                    "folder": folder,
-                    "title": clean_title,
-                    "artist": meta["artist"],
-                    "bpm": meta["bpm"],
-                    "offset": meta["offset"],
-                    "difficulties": meta["difficulties"],
-                    "audioFile": found_audio,
-                    "format": fmt,
-                    "keyCount": 4
-                })
-                print(" OK")
-            continue
-
-        # 2. BMSファイル群
-        if bms_files:
-            print(f"Processing BMS Group: {folder} ({len(bms_files)} files) ...", end="")
-            merged_charts = { "bpm": 130, "offset": 0, "bpmEvents": [], "keyCount": 7 }
-            difficulties = []
-            base_header = None
-            
-            for bms_file in bms_files:
-                header, data = parse_single_bms(bms_file)
-                if not header: continue
-                
-                if not base_header: 
-                    base_header = header
-                    merged_charts["bpm"] = header["bpm"]
-                    merged_charts["bpmEvents"] = data["bpmEvents"]
-                
-                fname = os.path.basename(bms_file)
-                diff_name = guess_bms_difficulty(fname, header["title"])
-                if diff_name in merged_charts: diff_name += "_2" 
-                
-                merged_charts[diff_name] = data["notes"]
-                difficulties.append(diff_name)
-            
-            difficulties.sort(key=lambda d: DIFFICULTY_ORDER.get(d, 99))
-            
-            if base_header:
-                with open(json_file, 'w', encoding='utf-8') as f:
-                    json.dump(merged_charts, f, indent=2)
-
-                found_audio = None
-                audio_candidates = [f for f in all_files if f.lower().endswith(('.ogg', '.mp3', '.wav'))]
-                if audio_candidates:
-                    found_audio = audio_candidates[0]
-                    for aud in audio_candidates:
-                        if "preview" not in aud.lower():
-                            found_audio = aud
-                            break
-                fmt = "mp3"
-                if found_audio:
-                    fmt = os.path.splitext(found_audio)[1][1:].lower()
-                else:
-                    found_audio = ""
-
-                # ★ここでタイトルから "Another" などを削除！
-                clean_title = base_header["title"]
-                # (Another) [ANOTHER] -Another- Another などを末尾から削除
-                clean_title = re.sub(r'\s*[\[\(-]?\s*another\s*[\]\)-]?\s*$', '', clean_title, flags=re.IGNORECASE).strip()
-                # 必要なら他の難易度も消す (例: Hyper, Normal)
-                clean_title = re.sub(r'\s*[\[\(-]?\s*(hyper|normal|beginner|leggendaria)\s*[\]\)-]?\s*$', '', clean_title, flags=re.IGNORECASE).strip()
-
-                song_list.append({
-                    "id": folder,
-                    "folder": folder,
-                    "title": clean_title, 
-                    "artist": base_header["artist"],
-                    "bpm": base_header["bpm"],
-                    "offset": 0,
-                    "difficulties": difficulties,
-                    "audioFile": found_audio,
-                    "format": fmt,
-                    "keyCount": 7
-                })
-                print(" OK")
-            else:
-                print(" Failed")
-
-    with open(OUTPUT_LIST, 'w', encoding='utf-8') as f:
-        json.dump(song_list, f, indent=2)
+    convert_library(
+        SONGS_DIR, JsonSink(),
+        on_skip=lambda folder, reason: print(f"Processing: {folder} ... Failed ({reason})"),
+        on_song=lambda song: print(f"Processing {song.source}: {song.folder} ... OK")
+    )
     print(f"\nSaved song list to {OUTPUT_LIST}")
 
 if __name__ == '__main__':
-    scan_all_songs()
\ No newline at end of file
+    scan_all_songs()
@@ -16,13 +16,13 @@ BMS_LANE_MAP = {
     '11': 1, '12': 2, '13': 3, '14': 4, '15': 5, '18': 6, '19': 7
 }
 
-def parse_bms(file_path, json_path):
+def parse_bms_chart(file_path):
     try:
         with open(file_path, 'r', encoding='shift_jis', errors='ignore') as f:
             lines = f.readlines()
     except Exception as e:
         print(f"Read error: {e}")
-        return None
+        return None, None
 
     header = { "title": "Unknown", "artist": "Unknown", "bpm": 130 }
     main_data = {}
@@ -45,7 +45,7 @@ def parse_bms(file_path, json_path):
                 main_data[measure].append({ 'channel': cmd[4:6], 'data': val.strip() })
 
     sorted_measures = sorted(main_data.keys())
-    if not sorted_measures: return None
+    if not sorted_measures: return None, None
     max_measure = sorted_measures[-1]
     
     notes = []
@@ -91,13 +91,19 @@ def parse_bms(file_path, json_path):
         
         current_time += (1.0 - last_pos) * measure_beats * (60.0 / current_bpm)
 
-    # JSON保存
     chart_data = {
         "bpm": header['bpm'],
         "offset": 0,
         "bpmEvents": bpm_events,
         "Hard": notes 
     }
+    return header, chart_data
+
+def parse_bms(file_path, json_path):
+    header, chart_data = parse_bms_chart(file_path)
+    if not header: return None
+
+    # JSON保存
     with open(json_path, 'w', encoding='utf-8') as f:
         json.dump(chart_data, f, indent=2)
 
@@ -0,0 +1,196 @@
+import os
+import json
+
+import numpy as np
+
+from auto_manager import DIFFICULTY_ORDER
+
+# 設定
+SONGS_DIR = "assets/songs"
+SONG_LIST = "assets/song_list.json"
+
+MAX_LANES = 8
+# 瞬間密度 (peak NPS) を測るスライド窓 (秒)
+PEAK_WINDOW_SEC = 2.0
+# 同一レーンでこの間隔以下の連打を縦連 (jack) とみなす
+JACK_INTERVAL = 0.2
+# 密度ヒストグラム (song_list に書き出す密度グラフ) の分割数
+DENSITY_SEGMENTS = 20
+
+# 難易度値 = 各特徴量の重み付き和
+# 密度 (NPS) を主にし、同時押し・縦連・ロングは補正程度にとどめる
+# (同梱曲で Easy<Hard, Normal<Hyper<Another<Insane が逆転しないことを確認済み)
+RATING_WEIGHTS = {
+    "peakNps": 0.6,
+    "avgNps": 0.8,
+    "chordRate": 1.0,
+    "jackRate": 1.0,
+    "holdRate": 0.5
+}
+
+
+# --- 全譜面をフラットな配列に読み込む ---
+def load_library(song_list):
+    charts = []  # (曲のindex, 難易度名)
+    times, lanes, durations, chart_ids = [], [], [], []
+
+    for song_idx, song in enumerate(song_list):
+        folder = song["folder"]
+        json_file = os.path.join(SONGS_DIR, folder, f"{folder}.json")
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                chart_data = json.load(f)
+        except Exception as e:
+            print(f"  [Error] Read failed: {folder}: {e}")
+            continue
+
+        for diff_name in song.get("difficulties", []):
+            notes = chart_data.get(diff_name) or []
+            chart_id = len(charts)
+            charts.append((song_idx, diff_name))
+            times.append(np.array([n["time"] for n in notes], dtype=np.float64))
+            lanes.append(np.array([n["lane"] for n in notes], dtype=np.int64))
+            durations.append(np.array([n.get("duration", 0) or 0 for n in notes], dtype=np.float64))
+            chart_ids.append(np.full(len(notes), chart_id, dtype=np.int64))
+
+    if not charts:
+        return charts, None
+
+    arrays = {
+        "time": np.concatenate(times),
+        "lane": np.clip(np.concatenate(lanes), 0, MAX_LANES - 1),
+        "duration": np.concatenate(durations),
+        "chart": np.concatenate(chart_ids)
+    }
+    return charts, arrays
+
+
+# --- ライブラリ全体を一括で解析 ---
+def analyze_library(arrays, n_charts):
+    t = arrays["time"]
+    lane = arrays["lane"]
+    dur = arrays["duration"]
+    c = arrays["chart"]
+
+    n_notes = np.bincount(c, minlength=n_charts)
+    has_notes = n_notes > 0
+
+    # 譜面の長さ (最初のノーツから最後のノーツ終端まで)
+    start = np.full(n_charts, np.inf)
+    end = np.full(n_charts, -np.inf)
+    np.minimum.at(start, c, t)
+    np.maximum.at(end, c, t + dur)
+    start = np.where(has_notes, start, 0.0)
+    end = np.where(has_notes, end, 0.0)
+    length = end - start
+
+    # スライド窓での最大ノーツ数 → peak NPS
+    # (譜面, 時刻) 順に並べ、各ノーツから [t, t + 窓) に入る同じ譜面のノーツ数を searchsorted で数える。
+    # 譜面ごとに時刻を ms 単位の整数にずらして1本の昇順キーにするので、メモリはノーツ数に比例する
+    window_ms = int(round(PEAK_WINDOW_SEC * 1000))
+    t_rel_ms = np.rint((t - start[c]) * 1000).astype(np.int64)
+    stride = (int(t_rel_ms.max()) if len(t) else 0) + window_ms + 1
+    key = np.sort(c * stride + t_rel_ms)
+    in_window = np.searchsorted(key, key + window_ms, side='left') - np.arange(len(key))
+    peak = np.zeros(n_charts, dtype=np.int64)
+    np.maximum.at(peak, key // stride, in_window)
+    peak_nps = peak / PEAK_WINDOW_SEC
+    avg_nps = n_notes / np.maximum(length, 1.0)
+
+    # 同時押し: 同じ譜面・同じ時刻 (ms単位) のノーツが2つ以上
+    t_ms = np.rint(t * 1000).astype(np.int64)
+    t_ms -= t_ms.min() if len(t_ms) else 0
+    _, inverse, counts = np.unique(c * (int(t_ms.max()) + 1 if len(t_ms) else 1) + t_ms,
+                                   return_inverse=True, return_counts=True)
+    is_chord = counts[inverse] > 1
+
+    # 縦連: 同じ譜面・同じレーンで直前のノーツとの間隔が JACK_INTERVAL 以下
+    order = np.lexsort((t, lane, c))
+    c_sorted, lane_sorted, t_sorted = c[order], lane[order], t[order]
+    is_jack = np.zeros(len(t), dtype=bool)
+    is_jack[order[1:]] = ((c_sorted[1:] == c_sorted[:-1]) &
+                          (lane_sorted[1:] == lane_sorted[:-1]) &
+                          (np.diff(t_sorted) <= JACK_INTERVAL))
+
+    # レーン別の集計 (譜面 x レーン)
+    lane_key = c * MAX_LANES + lane
+    size = n_charts * MAX_LANES
+    lane_notes = np.bincount(lane_key, minlength=size).reshape(n_charts, MAX_LANES)
+    lane_chords = np.bincount(lane_key, weights=is_chord, minlength=size).reshape(n_charts, MAX_LANES)
+    lane_jacks = np.bincount(lane_key, weights=is_jack, minlength=size).reshape(n_charts, MAX_LANES)
+    safe_lane_notes = np.maximum(lane_notes, 1)
+
+    safe_notes = np.maximum(n_notes, 1)
+    features = {
+        "peakNps": peak_nps,
+        "avgNps": avg_nps,
+        "chordRate": lane_chords.sum(axis=1) / safe_notes,
+        "jackRate": lane_jacks.sum(axis=1) / safe_notes,
+        "holdRate": np.bincount(c, weights=dur > 0, minlength=n_charts) / safe_notes
+    }
+    rating = sum(RATING_WEIGHTS[k] * v for k, v in features.items())
+    rating = np.where(has_notes, rating, 0.0)
+
+    # 密度グラフ用に DENSITY_SEGMENTS 分割へ縮約
+    seg_idx = np.floor((t - start[c]) / np.maximum(length[c], 1e-9) * DENSITY_SEGMENTS).astype(np.int64)
+    seg_idx = np.clip(seg_idx, 0, DENSITY_SEGMENTS - 1)
+    density = np.bincount(c * DENSITY_SEGMENTS + seg_idx,
+                          minlength=n_charts * DENSITY_SEGMENTS).reshape(n_charts, DENSITY_SEGMENTS)
+
+    return {
+        "notes": n_notes,
+        "length": length,
+        "rating": rating,
+        "density": density,
+        "laneChordRate": lane_chords / safe_lane_notes,
+        "laneJackRate": lane_jacks / safe_lane_notes,
+        **features
+    }
+
+
+# --- メイン処理 ---
+def rate_all_songs():
+    if not os.path.exists(SONG_LIST):
+        print(f"Song list not found: {SONG_LIST}")
+        return
+
+    with open(SONG_LIST, 'r', encoding='utf-8') as f:
+        song_list = json.load(f)
+
+    charts, arrays = load_library(song_list)
+    if not charts:
+        print("No charts found.")
+        return
+    print(f"Analyzing {len(charts)} charts ({len(arrays['time'])} notes)...")
+
+    stats = analyze_library(arrays, len(charts))
+
+    for chart_id, (song_idx, diff_name) in enumerate(charts):
+        song = song_list[song_idx]
+        key_count = song.get("keyCount", 4)
+        song.setdefault("chartStats", {})[diff_name] = {
+            "rating": round(float(stats["rating"][chart_id]), 1),
+            "notes": int(stats["notes"][chart_id]),
+            "length": round(float(stats["length"][chart_id]), 2),
+            "peakNps": round(float(stats["peakNps"][chart_id]), 2),
+            "avgNps": round(float(stats["avgNps"][chart_id]), 2),
+            "chordRate": [round(float(x), 3) for x in stats["laneChordRate"][chart_id][:key_count]],
+            "jackRate": [round(float(x), 3) for x in stats["laneJackRate"][chart_id][:key_count]],
+            "density": [int(x) for x in stats["density"][chart_id]]
+        }
+
+    # 難易度名の順序を優先し、名前で決まらないもの (未知の名前・同順位) だけ難易度値で並べる
+    for song in song_list:
+        chart_stats = song.get("chartStats", {})
+        song["difficulties"].sort(key=lambda d: (DIFFICULTY_ORDER.get(d.title(), 99),
+                                                 chart_stats.get(d, {}).get("rating", 0)))
+        for diff_name in song["difficulties"]:
+            print(f"  {song['folder']} / {diff_name}: {chart_stats.get(diff_name, {}).get('rating')}")
+
+    with open(SONG_LIST, 'w', encoding='utf-8') as f:
+        json.dump(song_list, f, indent=2)
+    print(f"\nSaved ratings to {SONG_LIST}")
+
+
+if __name__ == '__main__':
+    rate_all_songs()
@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+# 設定
+SONGS_DIR = "assets/songs"
+SONG_LIST = "assets/song_list.json"
+
+# js/main.js の requestAnimationFrame を 60fps として再現
+FRAME_DT = 1.0 / 60.0
+# js/main.js: 最後のノーツ終端からこの秒数で finishGame()
+FINISH_MARGIN = 2.0
+MAX_SCORE = 1000000
+# 同一レーンの重なり判定の許容誤差 (譜面の時間は小数4桁で丸められている)
+OVERLAP_EPS = 0.0005
+
+
+# duration が無いノーツはタップ扱い (JSの note.duration || 0 と同じ)
+def note_duration(note):
+    return note.get("duration", 0) or 0
+
+
+# --- 判定誤差計算 (js/logic.js:getEffectiveDiff と同じ) ---
+def get_effective_diff(bpm_events, current_time, target_time):
+    raw_diff = target_time - current_time
+    if raw_diff <= 0: return raw_diff
+
+    for i in range(len(bpm_events) - 1):
+        evt = bpm_events[i]
+        if evt["bpm"] == 0:
+            overlap_start = max(current_time, evt["time"])
+            overlap_end = min(target_time, bpm_events[i + 1]["time"])
+            if overlap_end > overlap_start:
+                raw_diff -= overlap_end - overlap_start
+    return raw_diff
+
+
+# --- 譜面データの静的チェック ---
+def check_chart_notes(notes, key_count):
+    errors = []
+    last_end = {}
+    for idx, note in enumerate(notes):
+        lane = note.get("lane", -1)
+        duration = note_duration(note)
+        if not 0 <= lane < key_count:
+            errors.append(f"note #{idx} at {note['time']}s: lane {lane} out of range (keyCount {key_count})")
+        if duration < 0:
+            errors.append(f"note #{idx} at {note['time']}s: negative duration {duration}")
+
+        prev_end = last_end.get(lane)
+        if prev_end is not None and note["time"] <= prev_end + OVERLAP_EPS:
+            errors.append(f"note #{idx} at {note['time']}s: overlaps previous note in lane {lane}")
+        end = note["time"] + max(duration, 0)
+        if prev_end is None or end > prev_end:
+            last_end[lane] = end
+    return errors
+
+
+# --- オートプレイの再現 (js/main.js:gameLoop + js/logic.js:handleJudge) ---
+def simulate_autoplay(notes, bpm_events):
+    # ホールドは始点と終点で2回カウントされる
+    total_counts = sum(2 if note_duration(n) > 0 else 1 for n in notes) or 1
+    unit_score = MAX_SCORE / total_counts
+
+    result = {
+        "score": 0.0, "perfect": 0, "maxCombo": 0,
+        "unjudged": 0, "unclosedHolds": 0, "clearTime": None
+    }
+
+    # 判定は時間順に進むので、未処理ノーツの先頭だけを見ればよい
+    order = sorted(range(len(notes)), key=lambda i: notes[i]["time"])
+    next_idx = 0
+    holding = []
+    combo = 0
+    remaining = len(notes)
+
+    def judge_perfect():
+        nonlocal combo
+        combo += 1
+        result["maxCombo"] = max(result["maxCombo"], combo)
+        result["perfect"] += 1
+        result["score"] = min(result["score"] + unit_score, MAX_SCORE)
+
+    # ゲームは state.notes の末尾ノーツ基準で終了する
+    last_note = notes[-1]
+    finish_time = last_note["time"] + note_duration(last_note) + FINISH_MARGIN
+
+    frame = 0
+    while True:
+        t = frame * FRAME_DT
+        if t > finish_time: break
+
+        # オートプレイ: 停止区間を考慮した誤差が0以下になったら PERFECT
+        while next_idx < len(order):
+            note = notes[order[next_idx]]
+            if get_effective_diff(bpm_events, t, note["time"]) > 0: break
+            next_idx += 1
+            judge_perfect()
+            if note_duration(note) > 0:
+                holding.append(note)
+            else:
+                remaining -= 1
+
+        # ロングノーツ終端
+        still_holding = []
+        for note in holding:
+            if t >= note["time"] + note_duration(note):
+                judge_perfect()
+                remaining -= 1
+            else:
+                still_holding.append(note)
+        holding = still_holding
+
+        if remaining == 0 and result["clearTime"] is None:
+            result["clearTime"] = round(t, 4)
+        frame += 1
+
+    result["unclosedHolds"] = len(holding)
+    result["unjudged"] = len(order) - next_idx
+    result["score"] = int(math.floor(result["score"] + 0.5))  # Math.round
+    return result
+
+
+# --- 1難易度分のチェック ---
+def check_difficulty(folder, diff_name, chart_data, key_count):
+    bpm_events = chart_data.get("bpmEvents") or [{"time": 0, "bpm": chart_data.get("bpm", 150)}]
+    errors = []
+    notes = chart_data.get(diff_name)
+    # js/scene.js:startGame と同じフォールバック (キーが無い時だけ。空配列はそのまま)
+    if notes is None:
+        notes = next((v for v in chart_data.values() if isinstance(v, list)), [])
+        if notes:
+            errors.append(f"difficulty '{diff_name}' missing in chart, game falls back to first chart")
+    if not notes:
+        return {"song": folder, "difficulty": diff_name, "ok": False,
+                "errors": ["No chart data found."]}
+
+    errors += check_chart_notes(notes, key_count)
+    sim = simulate_autoplay(notes, bpm_events)
+    if sim["unclosedHolds"]:
+        errors.append(f"{sim['unclosedHolds']} hold(s) still active when the game finishes")
+    if sim["unjudged"]:
+        errors.append(f"{sim['unjudged']} note(s) never judged before the game finishes")
+    if sim["score"] != MAX_SCORE:
+        errors.append(f"autoplay score {sim['score']} != {MAX_SCORE}")
+
+    return {
+        "song": folder, "difficulty": diff_name, "ok": not errors,
+        "notes": len(notes), "score": sim["score"], "maxCombo": sim["maxCombo"],
+        "clearTime": sim["clearTime"], "errors": errors
+    }
+
+
+# --- 1曲分の全難易度をチェック (プロセスプールのワーカー) ---
+def check_song(song):
+    folder = song["folder"]
+    json_file = os.path.join(SONGS_DIR, folder, f"{folder}.json")
+    key_count = song.get("keyCount", 4)
+    reports = []
+
+    try:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            chart_data = json.load(f)
+    except Exception as e:
+        return [{"song": folder, "difficulty": d, "ok": False, "errors": [f"Read failed: {e}"]}
+                for d in song.get("difficulties", [])]
+
+    for diff_name in song.get("difficulties", []):
+        # 壊れた譜面で1曲分のワーカーごと落ちないよう、その難易度の FAIL にする
+        try:
+            reports.append(check_difficulty(folder, diff_name, chart_data, key_count))
+        except Exception as e:
+            reports.append({"song": folder, "difficulty": diff_name, "ok": False,
+                            "errors": [f"Check failed: {type(e).__name__}: {e}"]})
+    return reports
+
+
+# --- メイン処理 ---
+def check_all_songs(workers=None):
+    if not os.path.exists(SONG_LIST):
+        print(f"Song list not found: {SONG_LIST}")
+        return []
+
+    with open(SONG_LIST, 'r', encoding='utf-8') as f:
+        song_list = json.load(f)
+    print(f"Checking {len(song_list)} songs with autoplay...")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = [r for reports in pool.map(check_song, song_list) for r in reports]
+
+    failed = 0
+    for r in results:
+        if r["ok"]:
+            print(f"  [PASS] {r['song']} / {r['difficulty']} ({r['notes']} notes, score {r['score']})")
+        else:
+            failed += 1
+            print(f"  [FAIL] {r['song']} / {r['difficulty']}")
+            for err in r["errors"]:
+                print(f"         - {err}")
+
+    print(f"\n{len(results) - failed}/{len(results)} charts passed.")
+    return results
+
+
+if __name__ == '__main__':
+    results = check_all_songs()
+    sys.exit(0 if results and all(r["ok"] for r in results) else 1)
@@ -1,4 +1,6 @@
 
+import { recordLoadPhase } from './telemetry.js';
+
 let audioCtx = null;
 let bgmSource = null;
 
@@ -14,9 +16,13 @@ export function getAudioContext() {
 
 export async function loadAudio(url) {
     if (!audioCtx) initAudio();
+    const t0 = performance.now();
     const response = await fetch(url);
     const arrayBuffer = await response.arrayBuffer();
+    const t1 = performance.now();
     const audioBuffer = await audioCtx.decodeAudioData(arrayBuffer);
+    recordLoadPhase('fetchAudio', t1 - t0);
+    recordLoadPhase('decodeAudio', performance.now() - t1);
     return audioBuffer;
 }
 
@@ -6,6 +6,7 @@ import { state } from './state.js';
 import { initInput } from './input.js';
 import { toTitle, finishGame, playStageClearEffect } from './scene.js';
 import { handleJudge, createHitEffect, getEffectiveDiff } from './logic.js';
+import { isTelemetryEnabled, recordFrame } from './telemetry.js';
 
 const canvas = document.getElementById('gameCanvas');
 
@@ -52,6 +53,9 @@ function gameLoop() {
         return;
     }
 
+    const frameStart = isTelemetryEnabled() ? performance.now() : 0;
+    let notesScanned = 0;
+
     let currentSongTime;
     if (state.isWaitingStart) {
         state.startTime = state.audioCtx.currentTime - state.globalOffset + 1.5;
@@ -63,6 +67,7 @@ function gameLoop() {
     // --- オートプレイ処理 ---
     if (state.isAuto && !state.isWaitingStart) { 
         state.notes.forEach(note => {
+            notesScanned++;
             if (note.hit || !note.visible) return;
             if (note.isHolding) return; 
 
@@ -97,6 +102,7 @@ function gameLoop() {
     });
     
     state.notes.forEach(note => {
+        notesScanned++;
         if (!note.visible) return;
         
         const effectiveDiff = getEffectiveDiff(currentSongTime, note.time);
@@ -125,7 +131,13 @@ function gameLoop() {
     });
 
     // --- 描画 ---
+    const updateEnd = isTelemetryEnabled() ? performance.now() : 0;
     renderGame(state);
+    if (isTelemetryEnabled() && !state.isWaitingStart) {
+        // drawNotes は全ノーツを走査する
+        notesScanned += state.notes.length;
+        recordFrame(frameStart, updateEnd - frameStart, performance.now() - updateEnd, notesScanned);
+    }
     
     if (state.isWaitingStart) {
         ctx.save();
@@ -2,6 +2,7 @@
 import { state, resetGameState } from './state.js';
 import { CONFIG, configureGameMode } from './constants.js';
 import { initAudio, loadAudio, stopMusic, playSound } from './audio.js';
+import { beginTelemetrySession, recordLoadPhase, endLoadPhase, flushTelemetry } from './telemetry.js';
 
 // DOM要素
 const scenes = {
@@ -87,6 +88,7 @@ export function toSelect() {
     state.calibData.active = false;
     if(state.calibData.timerId) clearTimeout(state.calibData.timerId);
     stopMusic();
+    flushTelemetry();
     switchScene('select');
     
     const settingPanel = document.getElementById('setting-panel');
@@ -256,6 +258,7 @@ export async function startGame(songData, difficulty = 'Hard') {
     
     state.selectedSong = songData; 
     state.selectedDifficulty = difficulty;
+    beginTelemetrySession(songData.folder, difficulty, state.gameMode);
     
     const overlay = document.getElementById('scene-select');
     // リトライ時などは現在のシーンを取得
@@ -272,7 +275,7 @@ export async function startGame(songData, difficulty = 'Hard') {
 
         const [musicBuffer, chartData] = await Promise.all([
             loadAudio(musicUrl),
-            fetch(chartUrl).then(res => res.json()) 
+            loadChart(chartUrl)
         ]);
         
         // ... (BPMイベント処理はそのまま) ...
@@ -319,6 +322,7 @@ export async function startGame(songData, difficulty = 'Hard') {
         
         state.musicBuffer = musicBuffer;
         state.musicDuration = musicBuffer.duration;
+        endLoadPhase(state.notes.length);
         
         // スピード倍率計算
         // 1. 各BPMが「合計で何秒間流れているか」を計算する
@@ -374,10 +378,22 @@ export async function startGame(songData, difficulty = 'Hard') {
     }
 }
 
+// 譜面JSONの取得 (テレメトリ用に取得とパースの時間を分けて測る)
+async function loadChart(chartUrl) {
+    const t0 = performance.now();
+    const text = await fetch(chartUrl).then(res => res.text());
+    const t1 = performance.now();
+    const chartData = JSON.parse(text);
+    recordLoadPhase('fetchChart', t1 - t0);
+    recordLoadPhase('parseChart', performance.now() - t1);
+    return chartData;
+}
+
 // --- RESULT SCENE ---
 export function finishGame() {
     state.isPlaying = false;
     stopMusic();
+    flushTelemetry();
     switchScene('result');
 
     const rank = getRank(state.score);
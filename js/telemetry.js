@@ -0,0 +1,87 @@
+// js/telemetry.js
+// 計測用テレメトリ (オプトイン)
+// 有効化: URLに ?telemetry を付ける、または localStorage の rhythmGame_telemetry を '1' にする
+// 送信先: telemetry_collector.py (ローカルで起動しておく)
+
+const TELEMETRY_URL = 'http://127.0.0.1:8765/telemetry';
+const BATCH_FRAMES = 300; // 約5秒分 (60fps) ごとに送信
+
+const enabled = new URLSearchParams(window.location.search).has('telemetry')
+    || localStorage.getItem('rhythmGame_telemetry') === '1';
+
+let session = null;
+let frames = [];
+let lastFrameStart = 0;
+
+export function isTelemetryEnabled() {
+    return enabled;
+}
+
+// 曲の読み込み開始時に呼ぶ
+export function beginTelemetrySession(songFolder, difficulty, gameMode) {
+    if (!enabled) return;
+    flushTelemetry();
+    session = {
+        id: `${Date.now()}-${Math.random().toString(36).slice(2, 8)}`,
+        song: songFolder,
+        difficulty: difficulty,
+        mode: gameMode,
+        load: {}
+    };
+    frames = [];
+    lastFrameStart = 0;
+}
+
+// 読み込み各段階の所要時間 (ms)
+export function recordLoadPhase(name, ms) {
+    if (!enabled || !session) return;
+    session.load[name] = ms;
+}
+
+// 読み込み完了時に呼ぶ (ノーツ数と各段階の時間をまとめて送る)
+export function endLoadPhase(noteCount) {
+    if (!enabled || !session) return;
+    session.notes = noteCount;
+    send({ type: 'load', load: session.load });
+}
+
+// 1フレーム分の計測 (frameStart は performance.now() の値)
+export function recordFrame(frameStart, updateMs, renderMs, notesScanned) {
+    if (!enabled || !session) return;
+    const frameMs = lastFrameStart ? frameStart - lastFrameStart : 0;
+    lastFrameStart = frameStart;
+    if (frameMs === 0) return;
+
+    frames.push([round2(frameMs), round2(updateMs), round2(renderMs), notesScanned]);
+    if (frames.length >= BATCH_FRAMES) flushTelemetry();
+}
+
+// 溜まったフレームを送信 (曲終了・選曲画面へ戻る時にも呼ぶ)
+export function flushTelemetry() {
+    if (!enabled || !session) return;
+    if (frames.length === 0) return;
+    send({ type: 'frames', frames: frames });
+    frames = [];
+}
+
+function send(payload) {
+    const body = JSON.stringify({
+        session: session.id,
+        song: session.song,
+        difficulty: session.difficulty,
+        mode: session.mode,
+        notes: session.notes || 0,
+        ...payload
+    });
+    // text/plain にして CORS のプリフライトを避ける
+    fetch(TELEMETRY_URL, {
+        method: 'POST',
+        headers: { 'Content-Type': 'text/plain' },
+        body: body,
+        keepalive: true
+    }).catch(err => console.warn("Telemetry send failed:", err));
+}
+
+function round2(ms) {
+    return Math.round(ms * 100) / 100;
+}
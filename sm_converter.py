@@ -83,8 +83,6 @@ def parse_sm(file_path):
             # ★重要: 停止「後」の時間も記録しておく（通過後のノーツ計算用）
             beat_time_map.append((current_beat, current_time))
 
-    print(f"Processed {len(bpm_events)} timing events.")
-
     # --- 3. ノーツの解析 ---
     # ★ここが修正のキモ: Beatから時間を計算する関数
     def get_time_at_beat(target_beat):
@@ -173,6 +171,7 @@ if __name__ == '__main__':
 
     print(f"Converting: {target_file}")
     charts = parse_sm(target_file)
+    print(f"Processed {len(charts.get('bpmEvents', []))} timing events.")
     output_path = target_file.replace(".sm", ".json")
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(charts, f, indent=2)
@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 設定
+HOST = "127.0.0.1"
+PORT = 8765
+TELEMETRY_DIR = "telemetry"
+
+# ローテーション: 1ファイルあたりの上限サイズと保持するファイル数
+MAX_FILE_BYTES = 5 * 1024 * 1024
+MAX_FILES = 10
+# 1リクエストの上限 (300フレームのバッチは十数KB程度)
+MAX_BODY_BYTES = 1024 * 1024
+
+PERCENTILES = (50, 95, 99)
+LOAD_PHASES = ("fetchChart", "parseChart", "fetchAudio", "decodeAudio")
+
+
+# --- ローテーションするJSONLファイル ---
+class RollingWriter:
+    def __init__(self, directory=TELEMETRY_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.path = None
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            if self.path is None or os.path.getsize(self.path) >= MAX_FILE_BYTES:
+                self._rotate()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def _rotate(self):
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(self.directory, f"telemetry_{stamp}.jsonl")
+        # 同じ秒に作られた場合は連番をつける
+        n = 1
+        while os.path.exists(self.path):
+            self.path = os.path.join(self.directory, f"telemetry_{stamp}_{n}.jsonl")
+            n += 1
+        open(self.path, 'a', encoding='utf-8').close()
+
+        files = list_telemetry_files(self.directory)
+        for old in files[:-MAX_FILES]:
+            os.remove(old)
+
+
+def list_telemetry_files(directory=TELEMETRY_DIR):
+    if not os.path.exists(directory): return []
+    files = [os.path.join(directory, f) for f in os.listdir(directory) if f.endswith('.jsonl')]
+    return sorted(files, key=os.path.getmtime)
+
+
+# --- 受信データの検証 ---
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def is_frame_row(row):
+    # [frameMs, updateMs, renderMs, notesScanned]
+    return isinstance(row, list) and len(row) == 4 and all(is_number(v) for v in row)
+
+
+def is_valid_record(record):
+    if not isinstance(record, dict): return False
+    if not all(isinstance(record.get(k), str) for k in ("session", "song", "difficulty", "mode")):
+        return False
+    if not is_number(record.get("notes", 0)): return False
+
+    if record.get("type") == "frames":
+        frames = record.get("frames")
+        return isinstance(frames, list) and all(is_frame_row(row) for row in frames)
+    if record.get("type") == "load":
+        load = record.get("load")
+        return isinstance(load, dict) and all(is_number(v) for v in load.values())
+    return False
+
+
+# --- 受信サーバー ---
+class TelemetryHandler(BaseHTTPRequestHandler):
+    writer = None
+
+    def _send_cors(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self._send_cors()
+        self.end_headers()
+
+    def do_POST(self):
+        if self.path != "/telemetry":
+            self.send_response(404)
+            self._send_cors()
+            self.end_headers()
+            return
+
+        record = None
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if 0 <= length <= MAX_BODY_BYTES:
+                record = json.loads(self.rfile.read(length).decode('utf-8'))
+        except (ValueError, UnicodeDecodeError):
+            pass
+        if not is_valid_record(record):
+            # 本文を読み切っていない可能性があるので接続は閉じる
+            self.close_connection = True
+            self.send_response(400)
+            self._send_cors()
+            self.end_headers()
+            return
+
+        record["received"] = time.time()
+        self.writer.write(record)
+        self.send_response(204)
+        self._send_cors()
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass  # 1フレームバッチごとのアクセスログは出さない
+
+
+def serve():
+    TelemetryHandler.writer = RollingWriter()
+    server = ThreadingHTTPServer((HOST, PORT), TelemetryHandler)
+    print(f"Telemetry collector listening on http://{HOST}:{PORT}/telemetry")
+    print(f"Saving to {TELEMETRY_DIR}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# --- レポート ---
+def percentile(sorted_values, p):
+    if not sorted_values: return 0.0
+    # nearest-rank
+    k = max(0, min(len(sorted_values) - 1, int(-(-p * len(sorted_values) // 100)) - 1))
+    return sorted_values[k]
+
+
+def load_records(directory=TELEMETRY_DIR):
+    for path in list_telemetry_files(directory):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line: continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def build_report(records):
+    groups = {}
+    for rec in records:
+        # 古いファイルや手で編集された行に壊れたデータがあっても落ちないようにする
+        if not isinstance(rec, dict): continue
+        key = (str(rec.get("song", "?")), str(rec.get("difficulty", "?")), str(rec.get("mode", "?")))
+        g = groups.setdefault(key, {"notes": 0, "frame": [], "update": [], "render": [],
+                                    "scanned": [], "load": {p: [] for p in LOAD_PHASES}, "sessions": set()})
+        if is_number(rec.get("notes")): g["notes"] = max(g["notes"], rec["notes"])
+        g["sessions"].add(str(rec.get("session")))
+
+        if rec.get("type") == "frames" and isinstance(rec.get("frames"), list):
+            for row in rec["frames"]:
+                if not is_frame_row(row): continue
+                frame_ms, update_ms, render_ms, scanned = row
+                g["frame"].append(frame_ms)
+                g["update"].append(update_ms)
+                g["render"].append(render_ms)
+                g["scanned"].append(scanned)
+        elif rec.get("type") == "load" and isinstance(rec.get("load"), dict):
+            for phase, ms in rec["load"].items():
+                if is_number(ms): g["load"].setdefault(phase, []).append(ms)
+
+    report = []
+    for (song, difficulty, mode), g in sorted(groups.items()):
+        frame = sorted(g["frame"])
+        update = sorted(g["update"])
+        render = sorted(g["render"])
+        report.append({
+            "song": song,
+            "difficulty": difficulty,
+            "mode": mode,
+            "notes": g["notes"],
+            "sessions": len(g["sessions"]),
+            "frames": len(frame),
+            "frameMs": {f"p{p}": percentile(frame, p) for p in PERCENTILES},
+            "updateMs": {f"p{p}": percentile(update, p) for p in PERCENTILES},
+            "renderMs": {f"p{p}": percentile(render, p) for p in PERCENTILES},
+            "notesScannedAvg": round(sum(g["scanned"]) / len(g["scanned"]), 1) if g["scanned"] else 0,
+            "loadMs": {phase: percentile(sorted(v), 50) for phase, v in g["load"].items() if v}
+        })
+    return report
+
+
+def print_report(report):
+    if not report:
+        print(f"No telemetry found in {TELEMETRY_DIR}/")
+        return
+
+    for r in report:
+        fm, um, rm = r["frameMs"], r["updateMs"], r["renderMs"]
+        print(f"{r['song']} / {r['difficulty']} [{r['mode']}] - {r['notes']} notes, "
+              f"{r['sessions']} session(s), {r['frames']} frames")
+        print(f"  frame  p50 {fm['p50']:6.2f}ms  p95 {fm['p95']:6.2f}ms  p99 {fm['p99']:6.2f}ms")
+        print(f"  update p50 {um['p50']:6.2f}ms  p95 {um['p95']:6.2f}ms  p99 {um['p99']:6.2f}ms")
+        print(f"  render p50 {rm['p50']:6.2f}ms  p95 {rm['p95']:6.2f}ms  p99 {rm['p99']:6.2f}ms")
+        print(f"  notes scanned/frame: {r['notesScannedAvg']}")
+        if r["loadMs"]:
+            phases = ", ".join(f"{k} {v:.1f}ms" for k, v in r["loadMs"].items())
+            print(f"  load (median): {phases}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == "report":
+        report = build_report(load_records())
+        if "--json" in sys.argv:
+            print(json.dumps(report, indent=2, ensure_ascii=False))
+        else:
+            print_report(report)
+    else:
+        serve()
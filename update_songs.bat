@@ -8,6 +8,19 @@ echo ==========================================
 
 python auto_manager.py
 
+echo.
+echo ==========================================
+echo 譜面の難易度値を計算します...
+echo ==========================================
+
+python -c "import numpy" >nul 2>&1
+if errorlevel 1 (
+    echo NumPy が見つからないため、難易度値の計算をスキップします。
+    echo インストール: pip install -r requirements.txt
+) else (
+    python chart_analyzer.py
+)
+
 echo.
 echo ==========================================
 echo 処理が完了しました。